@@ -2,10 +2,19 @@
 The Budget module contains all budget class related stuff.
 """
 from ipybudget.entry import Entry
-from ipybudget.group import Group
-from ipybudget.rates import Rates
+from ipybudget.export import write_csv, write_xlsx
+from ipybudget.group import Group, _replace_item
+from ipybudget.pivot import Pivot
+from ipybudget.rates import Rates, RatesNotInstalled
+from ipybudget.summary import Summary
 
-from typing import List, Union
+from decimal import Decimal
+from typing import (
+    Any, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple, Union
+)
+
+from money import Money
+from money.exceptions import ExchangeBackendNotInstalled
 
 
 class Budget:
@@ -36,6 +45,48 @@ class Budget:
     the budget class to offer the separate rendering of exchange rates in the
     Jupyter notebooks and it's exported documents.
     """
+    __tag_totals: Dict[Tuple[bool, str], Decimal]
+    """
+    Total amount per tag in the budget currency. The key consists of a flag
+    whether the tag total belongs to the incomes and the tag.
+    """
+    __tag_group_totals: Dict[Tuple[str, Group], Decimal]
+    """
+    Total amount per tag and group in the budget currency. Each tagged entry
+    contributes to all the groups on it's path to the root.
+    """
+    __tag_counts: Dict[str, int]
+    """Number of entries per tag, used to know which tags are in use."""
+    __placements: Dict[int, Tuple[Entry, List[Tuple]]]
+    """
+    Contains for each indexed entry (by id) where it's located in the budget
+    and which tags and amount it last contributed to the aggregates.
+    """
+    __currency: str
+    """Currency of the aggregates, the budget currency at indexing time."""
+    __frozen: bool
+    """Whether this is a persistent version created by Budget.freeze."""
+    __summary: Optional[Tuple[int, Summary]]
+    """
+    The cached summary of a persistent version together with the revision of
+    the exchange rates it was computed with.
+    """
+    __stamp: Tuple[int, str]
+    """
+    The revision of the exchange rates and the budget currency the tag
+    aggregates were built with.
+    """
+    __structure: List[Tuple[Union[str, Group], Tuple]]
+    """
+    The items of the top level lists (named by the attribute) and of all
+    groups at indexing time, used to detect structural changes.
+    """
+    __indexed: bool
+    """
+    Whether the tag aggregates were built. The aggregates are built on their
+    first usage, thus creating a budget (or a new version of it) doesn't
+    traverse the entries.
+    """
 
     def __init__(
         self,
@@ -46,6 +97,10 @@ class Budget:
         self.expenses = expenses
         self.incomes = incomes
         self.__rates = rates
+        self.__frozen = False
+        self.__summary = None
+        self.__indexed = False
+        self.__placements = {}
 
     @classmethod
     def set_currency(cls, currency: str):
@@ -57,3 +112,306 @@ class Budget:
         Group._set_currency(currency)
         Entry._set_currency(currency)
         Rates._set_currency(currency)
+
+    def freeze(self) -> "Budget":
+        """
+        Returns a persistent version of the budget. All groups and entries
+        are frozen, thus they can be shared with the versions derived by the
+        Budget.replace method. Use the ipybudget.history.History class to keep
+        track of the versions. A persistent version is returned as it is.
+        """
+        if self.__frozen:
+            return self
+        return self.__version(
+            tuple(item.freeze() for item in self.expenses),
+            tuple(item.freeze() for item in self.incomes),
+        )
+
+    def replace(
+        self,
+        path: Sequence[int],
+        item: Union[Entry, Group],
+        incomes: bool = False,
+    ) -> "Budget":
+        """
+        Returns a new persistent version of the budget with the expense (or
+        income if the incomes flag is set) at the given path replaced by the
+        item. The path contains the index of the item in each (sub-)group
+        from the top level downwards. Only the groups along the path are
+        copied, everything else is shared with this version.
+        """
+        base = self.freeze()
+        if incomes:
+            return self.__version(
+                base.expenses,
+                _replace_item(base.incomes, path, item.freeze()),
+            )
+        return self.__version(
+            _replace_item(base.expenses, path, item.freeze()),
+            base.incomes,
+        )
+
+    def __version(
+        self,
+        expenses: Tuple[Union[Entry, Group], ...],
+        incomes: Tuple[Union[Entry, Group], ...],
+    ) -> "Budget":
+        """Returns a new persistent version with the given frozen items."""
+        rsl = Budget(expenses=expenses, incomes=incomes, rates=self.__rates)
+        rsl.__frozen = True
+        return rsl
+
+    def summary(self) -> Summary:
+        """
+        Returns the totals of the expenses and incomes, the balance, the
+        number of entries and the currency exposure of the budget, computed
+        in a single traversal. The totals of all groups are cached along the
+        way and reused by the following group renderings until the budget or
+        the exchange rates change. Persistent versions (see Budget.freeze)
+        also cache the summary itself.
+        """
+        if self.__frozen:
+            cached = self.__summary
+            if cached is not None and cached[0] == Rates._revision:
+                return cached[1]
+        expenses, expense_exposure, expense_count = \
+            Group("Expenses", self.expenses)._aggregate()
+        incomes, income_exposure, income_count = \
+            Group("Incomes", self.incomes)._aggregate()
+        rsl = Summary(
+            expenses,
+            incomes,
+            expense_count,
+            income_count,
+            expense_exposure,
+            income_exposure,
+        )
+        if self.__frozen:
+            self.__summary = (Rates._revision, rsl)
+        return rsl
+
+    def _repr_html_(self):
+        """Output for the Jupyter notebook, renders the summary."""
+        return self.summary()._repr_html_()
+
+    def _repr_markdown_(self):
+        """Output for Markdown, renders the summary."""
+        return self.summary()._repr_markdown_()
+
+    def _export_rows(self) -> Iterator[List[Any]]:
+        """
+        Yields the spreadsheet export rows of the whole budget. The expenses
+        and incomes are exported as two top level groups.
+        """
+        currency = Group.currency
+        yield from Group("Expenses", self.expenses)._export_rows(currency)
+        yield from Group("Incomes", self.incomes)._export_rows(currency)
+
+    def to_csv(self, file: Union[str, TextIO]):
+        """
+        Exports the budget as a CSV spreadsheet. The file can either be a path
+        or an opened file-like object. The rows are streamed straight from
+        the tree walk, the converted column uses the budget currency.
+        """
+        write_csv(self._export_rows(), file)
+
+    def to_xlsx(self, path: str):
+        """
+        Exports the budget as a XLSX spreadsheet. Needs the optional
+        XlsxWriter package. The converted column uses the budget currency.
+        """
+        write_xlsx(self._export_rows(), path)
+
+    def reindex(self):
+        """
+        Rebuilds the tag aggregates with one traversal of the budget. This
+        happens automatically on the first usage of the aggregates and after
+        items were added, removed or replaced or the exchange rates or the
+        budget currency changed. Changes of the amount, currency or tags of
+        an indexed entry are applied incrementally.
+        """
+        self.__currency = Group.currency
+        self.__stamp = (Rates._revision, Group.currency)
+        self.__structure = [
+            ("expenses", tuple(self.expenses)),
+            ("incomes", tuple(self.incomes)),
+        ]
+        self.__tag_totals = {}
+        self.__tag_group_totals = {}
+        self.__tag_counts = {}
+        self.__placements = {}
+        self.__index_items(self.expenses, False, [])
+        self.__index_items(self.incomes, True, [])
+        self.__indexed = True
+
+    def __ensure_index(self):
+        """
+        Builds the tag aggregates if this didn't happen yet or if they are
+        outdated.
+        """
+        if not self.__indexed or not self.__index_valid():
+            self.reindex()
+
+    def __index_valid(self) -> bool:
+        """
+        Checks whether the tag aggregates are still valid. The exchange rates
+        and the budget currency have to be the same as during the indexing
+        and all item lists have to contain the same items. The item lists
+        are compared as they can be altered in place.
+        """
+        if self.__stamp != (Rates._revision, Group.currency):
+            return False
+        for owner, items in self.__structure:
+            if isinstance(owner, Group):
+                current = owner.items
+            else:
+                current = getattr(self, owner)
+            if len(current) != len(items):
+                return False
+            for old, item in zip(items, current):
+                if old is not item:
+                    return False
+        return True
+
+    def __index_items(
+        self,
+        items: List[Union[Entry, Group]],
+        incomes: bool,
+        path: List[Group],
+    ):
+        """Adds the entries of the items to the tag aggregates."""
+        for item in items:
+            if isinstance(item, Entry):
+                placement = (incomes, path, item.tags, self.__converted(item))
+                self.__apply(placement, 1)
+                if id(item) not in self.__placements:
+                    self.__placements[id(item)] = (item, [])
+                    # Frozen entries never change and are shared between
+                    # versions, thus they aren't observed.
+                    if not item._frozen:
+                        item._observe(self)
+                self.__placements[id(item)][1].append(placement)
+                continue
+            if isinstance(item, Group):
+                self.__structure.append((item, tuple(item.items)))
+                self.__index_items(item.items, incomes, path + [item])
+                continue
+            raise TypeError(
+                "Budget item has to be a Entry/Group, got {} instead".format(
+                    type(item))
+            )
+
+    def __converted(self, entry: Entry) -> Decimal:
+        """Returns the amount of the entry in the budget currency."""
+        try:
+            return entry.amount_by_currency(self.__currency).amount
+        except ExchangeBackendNotInstalled:
+            raise RatesNotInstalled
+
+    def __apply(
+        self,
+        placement: Tuple[bool, List[Group], Tuple[str, ...], Decimal],
+        sign: int,
+    ):
+        """Adds (sign 1) or removes (sign -1) a entry from the aggregates."""
+        incomes, path, tags, amount = placement
+        for tag in tags:
+            key = (incomes, tag)
+            self.__tag_totals[key] = \
+                self.__tag_totals.get(key, Decimal(0)) + sign * amount
+            self.__tag_counts[tag] = self.__tag_counts.get(tag, 0) + sign
+            if self.__tag_counts[tag] == 0:
+                del self.__tag_counts[tag]
+            for group in path:
+                key = (tag, group)
+                self.__tag_group_totals[key] = \
+                    self.__tag_group_totals.get(key, Decimal(0)) + \
+                    sign * amount
+
+    def _entry_changed(self, entry: Entry):
+        """
+        Called by an observed entry after it's amount, currency or tags were
+        altered. Replaces the previous contribution of the entry in the
+        aggregates by the current one.
+        """
+        if id(entry) not in self.__placements:
+            return
+        placements = self.__placements[id(entry)][1]
+        amount = self.__converted(entry)
+        for index, placement in enumerate(placements):
+            self.__apply(placement, -1)
+            incomes, path = placement[0], placement[1]
+            placements[index] = (incomes, path, entry.tags, amount)
+            self.__apply(placements[index], 1)
+
+    def tags(self) -> List[str]:
+        """Returns all tags used by the entries of the budget."""
+        self.__ensure_index()
+        return sorted(self.__tag_counts)
+
+    def tag_total(
+        self,
+        tag: str,
+        group: Optional[Group] = None,
+        incomes: bool = False,
+    ) -> Money:
+        """
+        Returns the total amount of all entries with the given tag in the
+        budget currency. When a group is given only the entries of this group
+        and it's sub-groups are taken into account. Otherwise the total of all
+        expenses (or incomes if the incomes flag is set) is returned. This is
+        a lookup in the maintained aggregates and doesn't traverse the budget.
+        """
+        self.__ensure_index()
+        return self.__tag_total(tag, group, incomes)
+
+    def __tag_total(
+        self,
+        tag: str,
+        group: Optional[Group],
+        incomes: bool,
+    ) -> Money:
+        """Looks up a tag total in the (already checked) aggregates."""
+        if group is None:
+            amount = self.__tag_totals.get((incomes, tag), Decimal(0))
+        else:
+            amount = self.__tag_group_totals.get((tag, group), Decimal(0))
+        return Money(amount, self.__currency)
+
+    def __entry_tag_total(self, entry: Entry, tag: str) -> Money:
+        """
+        Returns the amount the entry contributes to the given tag in the
+        budget currency as recorded in the (already checked) aggregates.
+        """
+        _, placements = self.__placements[id(entry)]
+        tags, amount = placements[0][2], placements[0][3]
+        if tag not in tags:
+            amount = Decimal(0)
+        return Money(amount, self.__currency)
+
+    def pivot(
+        self,
+        tags: Optional[List[str]] = None,
+        incomes: bool = False,
+    ) -> Pivot:
+        """
+        Returns a pivot table breaking down the top level groups of the
+        expenses (or the incomes if the flag is set) by the given tags. Top
+        level entries are shown as their own rows. Defaults to all tags used
+        in the budget. The table is filled from the maintained aggregates,
+        thus no traversal of the budget is needed.
+        """
+        self.__ensure_index()
+        if tags is None:
+            tags = sorted(self.__tag_counts)
+        items = self.incomes if incomes else self.expenses
+        rows = []
+        for item in items:
+            if isinstance(item, Group):
+                amounts = [
+                    self.__tag_total(tag, item, incomes) for tag in tags]
+            else:
+                amounts = [self.__entry_tag_total(item, tag) for tag in tags]
+            rows.append((item.code, item.name, amounts))
+        totals = [self.__tag_total(tag, None, incomes) for tag in tags]
+        return Pivot("Incomes" if incomes else "Expenses", tags, rows, totals)
@@ -2,11 +2,15 @@
 The entry module contains all income/expense entry related stuff.
 """
 from ipybudget import DEFAULT_CURRENCY
+from ipybudget.rates import quotation_at
 
-from typing import List, Union, Optional
+import datetime
+from typing import Any, Iterable, List, Tuple, Union, Optional
 from decimal import Decimal
+from weakref import WeakSet
 
-from money import Money
+from money import Money, xrates
+from money.exceptions import ExchangeRateNotFound
 from vdom import helpers as v
 
 
@@ -32,6 +36,34 @@ class Entry:
     """
     currency: str = DEFAULT_CURRENCY
     """ISO 4217 currency code for the group. Defaults to `EUR`."""
+    tags: Tuple[str, ...] = ()
+    """
+    Optional tags to break down the costs independently from the Group
+    structure (e.g. by funding source or cost type). Assign a new value to
+    alter the tags, the pivot aggregates of the Budget are updated on
+    assignment. Defaults to no tags.
+    """
+    date: Optional[datetime.date] = None
+    """
+    Optional date of the payment. Dated entries are converted with the
+    exchange rate valid at this date (see ipybudget.rates.Rates.add_rate).
+    Defaults to None, thus the undated rate is used.
+    """
+
+    _frozen: bool = False
+    """
+    Frozen entries are immutable and can be shared between multiple versions
+    of a budget. Use Entry.freeze to obtain a frozen entry and Entry.evolve
+    to derive a altered one.
+    """
+
+    _WATCHED = ("amount", "currency", "tags", "date")
+    """Attributes whose assignment notifies the observing budgets."""
+    _edits: int = 0
+    """
+    Incremented on every attribute assignment of an initialized entry. Used
+    to invalidate the cached totals of (mutable) groups.
+    """
 
     def __init__(
         self,
@@ -40,6 +72,8 @@ class Entry:
         code: str = "",
         comment: str = "",
         currency: Optional[str] = None,
+        tags: Iterable[str] = (),
+        date: Optional[datetime.date] = None,
     ):
         """
         Initialize a Entry instance with the default currency of the project.
@@ -51,6 +85,83 @@ class Entry:
         self.amount = Money(amount, self.currency)
         self.code = code
         self.comment = comment
+        self.tags = tags
+        self.date = date
+        # Assignments from now on are edits of the entry.
+        self.__dict__["_initialized"] = True
+
+    def __setattr__(self, name: str, value: Any):
+        """
+        Sets the attribute and informs the observing budgets when the amount,
+        the currency or the tags of the entry have changed. Tags are stored
+        as a tuple.
+        """
+        if self._frozen:
+            raise FrozenError(self)
+        if name == "tags":
+            value = _as_tags(value)
+        super(Entry, self).__setattr__(name, value)
+        if self.__dict__.get("_initialized"):
+            Entry._edits += 1
+        if name not in self._WATCHED:
+            return
+        for observer in list(self.__dict__.get("_observers", ())):
+            observer._entry_changed(self)
+
+    def evolve(self, **changes: Any) -> "Entry":
+        """
+        Returns a copy of the entry with the given attributes altered, the
+        entry itself stays untouched. Amounts can be given as a number and
+        are then expressed in the currency of the (new) entry. When altering
+        the currency the amount has to be given as well. The copy is frozen
+        if the entry is frozen.
+        """
+        for name in changes:
+            if name.startswith("_") or name not in Entry.__annotations__:
+                raise TypeError(
+                    "Entry has no attribute {}".format(name))
+        amount = changes.get("amount")
+        if isinstance(amount, Money) and "currency" not in changes:
+            changes["currency"] = amount.currency
+        currency = changes.get("currency", self.currency)
+        if currency != self.currency and amount is None:
+            raise TypeError(
+                "the amount is needed when altering the currency")
+        if isinstance(amount, Money) and amount.currency != currency:
+            raise TypeError(
+                "the amount has to be in the currency {}".format(currency))
+        state = {
+            key: value for key, value in self.__dict__.items()
+            if key != "_observers"
+        }
+        state["currency"] = self.currency
+        state.update(changes)
+        if not isinstance(state["amount"], Money):
+            state["amount"] = Money(state["amount"], state["currency"])
+        state["tags"] = _as_tags(state.get("tags", ()))
+
+        rsl = Entry.__new__(Entry)
+        rsl.__dict__.update(state)
+        return rsl
+
+    def freeze(self) -> "Entry":
+        """
+        Returns a frozen copy of the entry. Frozen entries are immutable and
+        therefore can be shared between multiple versions of a budget. A
+        already frozen entry is returned as it is.
+        """
+        if self._frozen:
+            return self
+        rsl = self.evolve()
+        rsl.__dict__["_frozen"] = True
+        return rsl
+
+    def _observe(self, observer):
+        """
+        Registers an observer (normally a Budget) which is informed about
+        changes of the entry. Observers are only weakly referenced.
+        """
+        self.__dict__.setdefault("_observers", WeakSet()).add(observer)
 
     @classmethod
     def _set_currency(cls, currency: str):
@@ -69,11 +180,18 @@ class Entry:
         Returns the amount of the entry with the requested currency. If the
         requested currency is the same as the entries currency no conversion is
         done to omit the requirement of a registered Rates instance when only
-        one currency is used.
+        one currency is used. Dated entries are converted with the rate valid
+        at their date.
         """
         if self.currency == currency:
             return self.amount
-        return self.amount.to(currency)
+        if self.date is None:
+            return self.amount.to(currency)
+        quotation = quotation_at(self.currency, currency, self.date)
+        if quotation is None:
+            raise ExchangeRateNotFound(
+                xrates.backend_name, self.currency, currency)
+        return Money(self.amount.amount * quotation, currency)
 
     def _vdom(self, is_supergroup: bool):
         return [
@@ -93,3 +211,44 @@ class Entry:
             str(self.amount),
             self.comment,
         ]]
+
+    def _export_row(self, converted: Money, depth: int) -> List[Any]:
+        """
+        Returns the spreadsheet export row of the entry. The converted amount
+        is passed in by the exporting group which also needs it for the
+        subtotal, thus the entry is converted only once.
+        """
+        return [
+            self.code,
+            self.name,
+            self.amount.amount,
+            self.currency,
+            converted.amount,
+            self.comment,
+            depth,
+        ]
+
+def _as_tags(tags: Iterable[str]) -> Tuple[str, ...]:
+    """
+    Returns the given tags as a tuple. A single string is rejected as it
+    would otherwise be split into it's characters.
+    """
+    if isinstance(tags, str):
+        raise TypeError(
+            "tags have to be a list of strings, got the string {!r}".format(
+                tags)
+        )
+    return tuple(tags)
+
+
+class FrozenError(Exception):
+    """
+    Raised when a frozen Entry or Group is altered. Frozen objects are shared
+    between the versions of a budget, use the evolve or replace methods to
+    derive a new version instead.
+    """
+
+    def __init__(self, item: Any):
+        msg = "{} is frozen, use evolve/replace to derive a altered " \
+            "version instead.".format(type(item).__name__)
+        super(Exception, self).__init__(msg)
@@ -0,0 +1,66 @@
+"""
+The export module contains the spreadsheet (CSV and XLSX) export related
+stuff. The rows are produced by the tree walk of the Groups and written one by
+one, thus the memory usage stays the same regardless of the budget size.
+"""
+import csv
+
+from typing import Any, Iterable, List, TextIO, Union
+
+EXPORT_HEADERS = [
+    "code",
+    "name",
+    "amount",
+    "currency",
+    "converted",
+    "comment",
+    "depth",
+]
+"""Column headers of the exported spreadsheets."""
+
+
+class XlsxWriterNotInstalled(Exception):
+    """
+    Raised when a XLSX export is requested but the optional XlsxWriter package
+    isn't available. Install it with `pip install ipybudget[xlsx]`.
+    """
+
+    def __init__(self):
+        msg = "the XLSX export needs the XlsxWriter package, install it " \
+            "with `pip install ipybudget[xlsx]`."
+        super(Exception, self).__init__(msg)
+
+
+def write_csv(rows: Iterable[List[Any]], file: Union[str, TextIO]):
+    """
+    Writes the given rows as CSV to the file. The file can either be a path
+    or an already opened file-like object.
+    """
+    if isinstance(file, str):
+        with open(file, "w", newline="") as f:
+            write_csv(rows, f)
+        return
+    writer = csv.writer(file)
+    writer.writerow(EXPORT_HEADERS)
+    writer.writerows(rows)
+
+
+def write_xlsx(rows: Iterable[List[Any]], path: str, sheet: str = "Budget"):
+    """
+    Writes the given rows into a new XLSX file at the given path. The
+    workbook is opened in XlsxWriter's constant memory mode which flushes
+    every row to disk as soon as the next one is written.
+    """
+    try:
+        import xlsxwriter
+    except ImportError:
+        raise XlsxWriterNotInstalled
+
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    try:
+        worksheet = workbook.add_worksheet(sheet)
+        worksheet.write_row(0, 0, EXPORT_HEADERS)
+        for index, row in enumerate(rows, start=1):
+            worksheet.write_row(index, 0, row)
+    finally:
+        workbook.close()
@@ -2,13 +2,18 @@
 The group module contains all income/expense group related stuff.
 """
 from ipybudget import DEFAULT_CURRENCY
-from ipybudget.entry import Entry
-from ipybudget.rates import RatesNotInstalled
+from ipybudget.entry import Entry, FrozenError
+from ipybudget.export import write_csv, write_xlsx
+from ipybudget.rates import Rates, RatesNotInstalled, quotations_at
 
-from typing import List, Union, Optional
+import datetime
+from decimal import Decimal
+from typing import (
+    Any, Dict, Generator, List, Sequence, TextIO, Tuple, Union, Optional
+)
 
-from money import Money
-from money.exceptions import ExchangeBackendNotInstalled
+from money import Money, xrates
+from money.exceptions import ExchangeBackendNotInstalled, ExchangeRateNotFound
 from pytablewriter import MarkdownTableWriter
 from pytablewriter.style import Style as TableStyle
 from vdom import helpers as v
@@ -36,6 +41,17 @@ class Group:
     short as they have the tendency to break the table layout. Use Markdown
     blocks in the Jupyter notebook instead. Defaults to an empty string.
     """
+    _edits: int = 0
+    """
+    Incremented on every attribute assignment of an initialized group. Used
+    to invalidate the cached totals of (mutable) groups.
+    """
+    _frozen: bool = False
+    """
+    Frozen groups are immutable and can be shared between multiple versions
+    of a budget. Use Group.freeze to obtain a frozen group and Group.replace
+    or Group.evolve to derive a altered one.
+    """
     currency: str = DEFAULT_CURRENCY
     """
     ISO 4217 currency code for the group. Defaults to `EUR`. Can be changed by
@@ -61,6 +77,8 @@ class Group:
         self.comment = comment
         if currency:
             self.currency = currency
+        # Assignments from now on are edits of the group.
+        self.__dict__["_initialized"] = True
 
     @classmethod
     def _from_entry(cls, entry: Entry) -> "Group":
@@ -68,12 +86,10 @@ class Group:
         Generates a Group from a single Entry. Used for rendering Groups
         containing sub-Groups and single items at the same time.
         """
-        code = entry.code
-        entry.code = ""
         return cls(
             entry.name,
-            [entry],
-            code=code,
+            [entry.evolve(code="")],
+            code=entry.code,
             comment="",
             currency=entry.currency,
         )
@@ -94,11 +110,94 @@ class Group:
         """
         Calculates the total sum of all entries in the group and it's
         subgroups. The items have to be a Entry or a Group otherwise a
-        exception will be thrown.
+        exception will be thrown. The rates of dated entries are looked up
+        in one batch per currency. The total is cached (see Group._aggregate),
+        versions sharing a frozen group also share it's total.
+        """
+        return self._aggregate()[0]
+
+    def _aggregate(self) -> Tuple[Money, Dict[str, Decimal], int]:
+        """
+        Returns the total, the native amounts per currency and the number of
+        entries of the group and it's subgroups, all computed in the same
+        traversal. The result is cached, thus following calls (e.g. by the
+        renderers after a Budget.summary) reuse it. Frozen groups keep the
+        cache until the exchange rates change, other groups also until any
+        entry or group is altered or the items of the group (or one of it's
+        sub-groups) are replaced.
+        """
+        cached = self.__dict__.get("_aggregated")
+        if cached is not None and self.__cache_valid(cached):
+            return cached[3]
+        rsl, subs = self.__aggregate()
+        self.__dict__["_aggregated"] = (
+            self.__stamp(), tuple(self.items), subs, rsl)
+        return rsl
+
+    def __stamp(self) -> Tuple[int, int, int]:
+        """
+        Returns the revisions the cached aggregate depends on. Frozen groups
+        can't be altered and only depend on the exchange rates.
+        """
+        if self._frozen:
+            return (Rates._revision, 0, 0)
+        return (Rates._revision, Entry._edits, Group._edits)
+
+    def __cache_valid(self, cached: Tuple) -> bool:
+        """
+        Checks whether the cached aggregate is still valid. For mutable
+        groups this also compares the items of the group and checks that the
+        sub-groups still hold the (valid) aggregates this one was built from,
+        as their item lists can be altered in place and they can be
+        recalculated on their own.
+        """
+        stamp, items, subs, _ = cached
+        if stamp != self.__stamp():
+            return False
+        if self._frozen:
+            return True
+        if len(items) != len(self.items):
+            return False
+        for old, item, sub in zip(items, self.items, subs):
+            if old is not item:
+                return False
+            if not isinstance(item, Group):
+                continue
+            sub_cached = item.__dict__.get("_aggregated")
+            if sub_cached is None or sub_cached[3] is not sub:
+                return False
+            if not item._frozen and not item.__cache_valid(sub_cached):
+                return False
+        return True
+
+    def __aggregate(
+            self,
+    ) -> Tuple[Tuple[Money, Dict[str, Decimal], int], Tuple]:
+        """
+        Calculates the aggregate without using the cache. Also returns the
+        aggregates of the items (None for entries) it was built from.
         """
         rsl = Money(0, self.currency)
+        exposure: Dict[str, Decimal] = {}
+        count = 0
+        subs: List[Optional[Tuple]] = []
+        # Dated entries in foreign currencies, collected per currency to
+        # look up their rates in one batch.
+        dated: Dict[str, Tuple[List[Decimal], List[datetime.date]]] = {}
 
         for item in self.items:
+            if isinstance(item, Entry):
+                subs.append(None)
+                count += 1
+                exposure[item.currency] = \
+                    exposure.get(item.currency, Decimal(0)) + \
+                    item.amount.amount
+            if isinstance(item, Entry) and item.date is not None and \
+                    item.currency != self.currency:
+                amounts, days = dated.setdefault(item.currency, ([], []))
+                amounts.append(item.amount.amount)
+                days.append(item.date)
+                continue
             if isinstance(item, Entry):
                 try:
                     rsl += item.amount_by_currency(self.currency)
@@ -106,16 +205,34 @@ class Group:
                     raise RatesNotInstalled
                 continue
             if isinstance(item, Group):
+                sub = item._aggregate()
+                subs.append(sub)
+                total, sub_exposure, sub_count = sub
                 try:
-                    rsl += item.total().to(self.currency)
+                    rsl += total.to(self.currency)
                 except ExchangeBackendNotInstalled:
                     raise RatesNotInstalled
+                for currency, amount in sub_exposure.items():
+                    exposure[currency] = \
+                        exposure.get(currency, Decimal(0)) + amount
+                count += sub_count
                 continue
             raise TypeError(
                 "Group item has to be a Entry/Group, got {} instead".format(
                     type(item))
             )
-        return rsl
+
+        for currency, (amounts, days) in dated.items():
+            try:
+                quotations = quotations_at(currency, self.currency, days)
+            except ExchangeBackendNotInstalled:
+                raise RatesNotInstalled
+            for amount, quotation in zip(amounts, quotations):
+                if quotation is None:
+                    raise ExchangeRateNotFound(
+                        xrates.backend_name, currency, self.currency)
+                rsl += Money(amount * quotation, self.currency)
+        return (rsl, exposure, count), tuple(subs)
 
     def _vdom(self, is_supergroup: bool):
         rsl = []
@@ -191,6 +308,131 @@ class Group:
 
         return rsl
 
+    def __setattr__(self, name: str, value: Any):
+        """Sets the attribute unless the group is frozen."""
+        if self._frozen:
+            raise FrozenError(self)
+        super(Group, self).__setattr__(name, value)
+        if self.__dict__.get("_initialized"):
+            Group._edits += 1
+
+    def evolve(self, **changes: Any) -> "Group":
+        """
+        Returns a copy of the group with the given attributes altered, the
+        group itself stays untouched. The items are shared with the copy
+        unless they are replaced. The copy is frozen if the group is frozen.
+        """
+        for name in changes:
+            if name.startswith("_") or name not in Group.__annotations__:
+                raise TypeError(
+                    "Group has no attribute {}".format(name))
+        state = {
+            key: value for key, value in self.__dict__.items()
+            if key != "_aggregated"
+        }
+        state["currency"] = self.currency
+        state.update(changes)
+        if self._frozen:
+            state["items"] = tuple(item.freeze() for item in state["items"])
+
+        rsl = Group.__new__(Group)
+        rsl.__dict__.update(state)
+        return rsl
+
+    def freeze(self) -> "Group":
+        """
+        Returns a frozen copy of the group and all it's items. Frozen groups
+        are immutable and therefore can be shared between multiple versions
+        of a budget, they also cache their total. A already frozen group is
+        returned as it is.
+        """
+        if self._frozen:
+            return self
+        rsl = self.evolve(
+            items=tuple(item.freeze() for item in self.items))
+        rsl.__dict__["_frozen"] = True
+        return rsl
+
+    def replace(
+            self,
+            path: Sequence[int],
+            item: Union[Entry, "Group"],
+    ) -> "Group":
+        """
+        Returns a new version of the group with the item at the given path
+        replaced. The path contains the index of the item in each (sub-)group
+        from this group downwards. Only the groups along the path are copied,
+        all other items (and their cached totals) are shared with this
+        version.
+        """
+        return self.evolve(items=_replace_item(self.items, path, item))
+
+    def _export_rows(
+            self,
+            currency: str,
+            depth: int = 0,
+    ) -> Generator[List[Any], None, Money]:
+        """
+        Yields the spreadsheet export rows of the group and it's sub-groups
+        while walking the tree. The subtotal row of each group is emitted
+        after it's items, the total is accumulated along the way and returned
+        by the generator so no additional traversal is needed.
+        """
+        yield [self.code, self.name, "", "", "", self.comment, depth]
+
+        rsl = Money(0, self.currency)
+        for item in self.items:
+            try:
+                if isinstance(item, Entry):
+                    amount = item.amount_by_currency(self.currency)
+                    converted = amount
+                    if currency != self.currency:
+                        converted = item.amount_by_currency(currency)
+                    yield item._export_row(converted, depth + 1)
+                    rsl += amount
+                    continue
+                if isinstance(item, Group):
+                    total = yield from item._export_rows(currency, depth + 1)
+                    rsl += total.to(self.currency)
+                    continue
+            except ExchangeBackendNotInstalled:
+                raise RatesNotInstalled
+            raise TypeError(
+                "Group item has to be a Entry/Group, got {} instead".format(
+                    type(item))
+            )
+
+        try:
+            converted = rsl.to(currency).amount
+        except ExchangeBackendNotInstalled:
+            raise RatesNotInstalled
+        yield [
+            "",
+            f"Total {self.name}",
+            rsl.amount,
+            self.currency,
+            converted,
+            "",
+            depth,
+        ]
+        return rsl
+
+    def to_csv(self, file: Union[str, TextIO]):
+        """
+        Exports the group as a CSV spreadsheet. The file can either be a path
+        or an opened file-like object. The rows are streamed straight from
+        the tree walk, the converted column uses the currency of this group.
+        """
+        write_csv(self._export_rows(self.currency), file)
+
+    def to_xlsx(self, path: str):
+        """
+        Exports the group as a XLSX spreadsheet. Needs the optional
+        XlsxWriter package. The converted column uses the currency of this
+        group.
+        """
+        write_xlsx(self._export_rows(self.currency), path)
+
     def __contains_groups(self) -> bool:
         """Returns true when the Group contains one or more sub-groups."""
         for entry in self.items:
@@ -267,3 +509,31 @@ class Group:
             margin=1,
         )
         return writer.dumps()
+
+
+def _replace_item(
+        items: Sequence[Union[Entry, Group]],
+        path: Sequence[int],
+        item: Union[Entry, Group],
+) -> Sequence[Union[Entry, Group]]:
+    """
+    Returns a copy of the items with the item at the given path replaced. The
+    sub-groups along the path are replaced by new versions, all other items
+    are shared. The type of the items sequence is preserved.
+    """
+    if not path:
+        raise ValueError("the path of the replaced item is empty")
+    index, rest = path[0], path[1:]
+    if rest:
+        group = items[index]
+        if not isinstance(group, Group):
+            raise TypeError(
+                "path has to lead through Groups, got {} instead".format(
+                    type(group))
+            )
+        item = group.replace(rest, item)
+    rsl = list(items)
+    rsl[index] = item
+    if isinstance(items, tuple):
+        return tuple(rsl)
+    return rsl
@@ -0,0 +1,76 @@
+"""
+The history module contains the versioning of budgets used for keeping track
+of the changes and undoing them.
+"""
+from ipybudget.budget import Budget
+from ipybudget.entry import Entry
+from ipybudget.group import Group
+
+from typing import List, Sequence, Union
+
+
+class History:
+    """
+    The History keeps all versions of a budget. The versions are persistent
+    budgets (see ipybudget.budget.Budget.freeze) sharing all unchanged groups
+    and entries with each other, thus a new version only costs the groups
+    along the path to the altered item. The totals cached by the shared
+    groups are reused by all versions.
+    """
+
+    versions: List[Budget]
+    """All versions of the budget, the oldest first."""
+    position: int
+    """Index of the current version, altered by undo and redo."""
+
+    def __init__(self, budget: Budget):
+        """
+        Initializes the history with a persistent version of the given budget
+        as the first version.
+        """
+        self.versions = [budget.freeze()]
+        self.position = 0
+
+    @property
+    def current(self) -> Budget:
+        """Returns the current version of the budget."""
+        return self.versions[self.position]
+
+    def commit(self, budget: Budget) -> Budget:
+        """
+        Adds the budget as the new current version. Versions undone before
+        are discarded. Returns the persistent version of the budget.
+        """
+        del self.versions[self.position + 1:]
+        self.versions.append(budget.freeze())
+        self.position = len(self.versions) - 1
+        return self.current
+
+    def replace(
+            self,
+            path: Sequence[int],
+            item: Union[Entry, Group],
+            incomes: bool = False,
+    ) -> Budget:
+        """
+        Replaces the item at the given path of the current version and adds
+        the result as the new version (see ipybudget.budget.Budget.replace).
+        """
+        return self.commit(self.current.replace(path, item, incomes))
+
+    def undo(self) -> Budget:
+        """Steps back to the previous version and returns it."""
+        if self.position == 0:
+            raise IndexError("there is no version to undo")
+        self.position -= 1
+        return self.current
+
+    def redo(self) -> Budget:
+        """Steps forward to the next (undone) version and returns it."""
+        if self.position == len(self.versions) - 1:
+            raise IndexError("there is no version to redo")
+        self.position += 1
+        return self.current
+
+    def __len__(self) -> int:
+        return len(self.versions)
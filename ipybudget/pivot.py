@@ -0,0 +1,92 @@
+"""
+The pivot module contains the rendering of the tag based pivot tables.
+"""
+from typing import List, Tuple
+
+from money import Money
+from pytablewriter import MarkdownTableWriter
+from pytablewriter.style import Style as TableStyle
+from vdom import helpers as v
+
+
+class Pivot:
+    """
+    A Pivot breaks down the costs of a budget by tags instead of the Group
+    structure. Each row represents a group, each column a tag. Instances are
+    created by the ipybudget.budget.Budget.pivot method which fills the table
+    from the incrementally maintained aggregates of the budget, thus creating
+    a pivot is a simple lookup. The class implements the IPython repl methods
+    for outputting HTML and Markdown.
+    """
+
+    name: str
+    """Title of the pivot table, used for the total row."""
+    tags: List[str]
+    """The tags used as the columns of the table."""
+    rows: List[Tuple[str, str, List[Money]]]
+    """Code, name and the amount per tag of each group."""
+    totals: List[Money]
+    """The total amount per tag."""
+
+    def __init__(
+            self,
+            name: str,
+            tags: List[str],
+            rows: List[Tuple[str, str, List[Money]]],
+            totals: List[Money],
+    ):
+        self.name = name
+        self.tags = tags
+        self.rows = rows
+        self.totals = totals
+
+    def _repr_html_(self):
+        """Output for the Jupyter notebook."""
+        rsl = []
+        rsl.append(
+            v.tr(
+                v.th("Pos.", style={"text-align": "right"}),
+                v.th("Bezeichnung", style={"text-align": "left"}),
+                *[v.th(tag, style={"text-align": "right"})
+                  for tag in self.tags],
+            ),
+        )
+        for code, name, amounts in self.rows:
+            rsl.append(
+                v.tr(
+                    v.td(code, style={"text-align": "right"}),
+                    v.td(name, style={"text-align": "left"}),
+                    *[v.td(str(amount), style={"text-align": "right"})
+                      for amount in amounts],
+                ),
+            )
+        rsl.append(
+            v.tr(
+                v.td(),
+                v.td(v.b(f"Total {self.name}"), style={"text-align": "left"}),
+                *[v.td(v.b(str(total)), style={"text-align": "right"})
+                  for total in self.totals],
+            ),
+        )
+        return v.table(*rsl).to_html()
+
+    def _repr_markdown_(self):
+        """Output for Markdown."""
+        rsl = []
+        for code, name, amounts in self.rows:
+            rsl.append([code, name] + [str(amount) for amount in amounts])
+        rsl.append(
+            ["", f"**Total {self.name}**"] +
+            ["**{}**".format(str(total)) for total in self.totals]
+        )
+
+        writer = MarkdownTableWriter(
+            headers=["Pos.", "Bezeichnung"] + self.tags,
+            column_styles=[
+                TableStyle(align="right"),
+                TableStyle(align="left"),
+            ] + [TableStyle(align="right") for _ in self.tags],
+            value_matrix=rsl,
+            margin=1,
+        )
+        return writer.dumps()
@@ -4,8 +4,11 @@ is accomplished by implementing the BackendBase object of the money package.
 """
 from ipybudget import DEFAULT_CURRENCY
 
+import csv
+import datetime
+from bisect import bisect_right
 from decimal import Decimal
-from typing import Dict
+from typing import Dict, List, Optional, Sequence, TextIO, Tuple, Union
 
 from money import xrates
 from money.exchange import BackendBase
@@ -26,6 +29,10 @@ class Rates(BackendBase):
     money package. By instantiating a new Rates instance, this will get
     automatically registered as the default backend for *all* currency
     calculations.
+
+    For budgets spanning a longer period the rates can also be defined over
+    time by using the Rates.add_rate or Rates.load_csv methods. Entries with
+    a date are then converted with the rate valid at their date.
     """
     __base_currency: str = DEFAULT_CURRENCY
     """
@@ -36,7 +43,19 @@ class Rates(BackendBase):
     __rates: Dict[str, Decimal] = {}
     """
     Used to store additional exchange rates expressed relative to the
-    base_currency. You can add a rate by using the add_rate method.
+    base_currency. You can add a rate by using the add_currency method.
+    """
+    __history: Dict[str, Tuple[List[datetime.date], List[Decimal]]]
+    """
+    Stores the rates over time per currency as two sorted parallel lists
+    containing the dates from which on a rate is valid and the rates itself.
+    Keeping the dates in a separate list allows the lookup by bisection. You
+    can add rates by using the add_rate or load_csv methods.
+    """
+    _revision: int = 0
+    """
+    Incremented on every change of the exchange rates or the base currency.
+    Used to invalidate the cached totals of frozen groups.
     """
 
     def __init__(self):
@@ -44,7 +63,9 @@ class Rates(BackendBase):
         Returns a new instance of the Rates and register this as the new
         default for currency conversion for *all* calculations.
         """
+        self.__history = {}
         xrates.install(self)
+        Rates._revision += 1
 
     @classmethod
     def _set_currency(cls, currency: str):
@@ -57,6 +78,7 @@ class Rates(BackendBase):
         method instead.
         """
         cls.__base_currency = currency
+        Rates._revision += 1
 
     def add_currency(self, currency: str, rate: Decimal):
         """
@@ -64,6 +86,53 @@ class Rates(BackendBase):
         standard) and a exchange rate relative to the base currency.
         """
         self.__rates[currency] = Decimal(rate)
+        Rates._revision += 1
+
+    def add_rate(
+        self,
+        currency: str,
+        rate: Decimal,
+        valid_from: datetime.date,
+    ):
+        """
+        Add a exchange rate relative to the base currency which is valid from
+        the given date on until the next rate of the currency. An existing
+        rate for the same date is replaced.
+        """
+        Rates._revision += 1
+        dates, rates = self.__history.setdefault(currency, ([], []))
+        index = bisect_right(dates, valid_from)
+        if index > 0 and dates[index - 1] == valid_from:
+            rates[index - 1] = Decimal(rate)
+            return
+        dates.insert(index, valid_from)
+        rates.insert(index, Decimal(rate))
+
+    def load_csv(self, file: Union[str, TextIO]):
+        """
+        Loads historical exchange rates in bulk from a local CSV file. The
+        file needs the columns `date` (ISO 8601), `currency` and `rate`. The
+        file can either be a path or an opened file-like object. The rates of
+        each currency are sorted once after reading.
+        """
+        if isinstance(file, str):
+            with open(file, newline="") as f:
+                self.load_csv(f)
+            return
+
+        loaded: Dict[str, Dict[datetime.date, Decimal]] = {}
+        for row in csv.DictReader(file):
+            day = datetime.date.fromisoformat(row["date"].strip())
+            currency = row["currency"].strip()
+            loaded.setdefault(currency, {})[day] = Decimal(row["rate"])
+
+        for currency, rates in loaded.items():
+            dates, values = self.__history.get(currency, ([], []))
+            merged = dict(zip(dates, values))
+            merged.update(rates)
+            days = sorted(merged)
+            self.__history[currency] = (days, [merged[d] for d in days])
+        Rates._revision += 1
 
     def base(self):
         """
@@ -78,7 +147,86 @@ class Rates(BackendBase):
         """
         if currency == self.__base_currency:
             return Decimal(1)
-        return self.__rates.get(currency, None)
+        if currency in self.__rates or currency not in self.__history:
+            return self.__rates.get(currency, None)
+        # Only historical rates are known, use the latest one.
+        return self.__history[currency][1][-1]
+
+    def rate_at(self, currency: str, day: datetime.date) -> Optional[Decimal]:
+        """
+        Returns the rate of the currency valid at the given date. Falls back
+        to the undated rate when no historical rate is known for the date.
+        """
+        if currency == self.__base_currency:
+            return Decimal(1)
+        if currency not in self.__history:
+            return self.rate(currency)
+        dates, rates = self.__history[currency]
+        index = bisect_right(dates, day)
+        if index == 0:
+            return self.__rates.get(currency, None)
+        return rates[index - 1]
+
+    def __rates_at(
+        self,
+        currency: str,
+        days: Sequence[datetime.date],
+    ) -> List[Optional[Decimal]]:
+        """
+        Returns the rates of the currency for the given *sorted* dates. The
+        history is searched once alongside the dates, each search starting
+        at the position of the previous date.
+        """
+        if currency == self.__base_currency or \
+                currency not in self.__history:
+            return [self.rate(currency)] * len(days)
+        dates, rates = self.__history[currency]
+        fallback = self.__rates.get(currency, None)
+        rsl = []
+        index = 0
+        for day in days:
+            # The dates are sorted, thus the search starts at the last match.
+            index = bisect_right(dates, day, index)
+            rsl.append(rates[index - 1] if index > 0 else fallback)
+        return rsl
+
+    def quotation_at(
+        self,
+        origin: str,
+        target: str,
+        day: datetime.date,
+    ) -> Optional[Decimal]:
+        """
+        Returns the quotation between the two currencies valid at the given
+        date.
+        """
+        a = self.rate_at(origin, day)
+        b = self.rate_at(target, day)
+        if a and b:
+            return b / a
+        return None
+
+    def quotations_at(
+        self,
+        origin: str,
+        target: str,
+        days: Sequence[datetime.date],
+    ) -> List[Optional[Decimal]]:
+        """
+        Returns the quotations between the two currencies for each of the
+        given dates. The dates are sorted once and matched against the
+        history in a single pass, use this when converting many entries.
+        """
+        order = sorted(range(len(days)), key=days.__getitem__)
+        ordered = [days[i] for i in order]
+        origins = self.__rates_at(origin, ordered)
+        targets = self.__rates_at(target, ordered)
+
+        rsl: List[Optional[Decimal]] = [None] * len(days)
+        for index, a, b in zip(order, origins, targets):
+            if a and b:
+                rsl[index] = b / a
+        return rsl
 
     def quotation(self, origin, target):
         """
@@ -100,3 +248,38 @@ class RatesNotInstalled(Exception):
         msg = "you tried to use multiple currencies without defining " \
             "the exchange rates by instantiate a Rates instance."
         super(Exception, self).__init__(msg)
+
+
+def quotation_at(
+    origin: str,
+    target: str,
+    day: datetime.date,
+) -> Optional[Decimal]:
+    """
+    Returns the quotation between the two currencies valid at the given date
+    using the installed exchange backend. The history is looked up by
+    bisection, use quotations_at for many dates. When the backend doesn't
+    support historical rates the undated quotation is used.
+    """
+    try:
+        lookup = xrates.quotation_at
+    except AttributeError:
+        return xrates.quotation(origin, target)
+    return lookup(origin, target, day)
+
+
+def quotations_at(
+    origin: str,
+    target: str,
+    days: Sequence[datetime.date],
+) -> List[Optional[Decimal]]:
+    """
+    Returns the quotations between the two currencies for the given dates
+    using the installed exchange backend. When the backend doesn't support
+    historical rates the undated quotation is used for all dates.
+    """
+    try:
+        lookup = xrates.quotations_at
+    except AttributeError:
+        return [xrates.quotation(origin, target)] * len(days)
+    return lookup(origin, target, days)
@@ -0,0 +1,191 @@
+"""
+The service module contains the asyncio based rendering service used to serve
+budget previews (e.g. from a small web application) without blocking the
+event loop.
+"""
+from ipybudget.budget import Budget
+
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from money import Money
+
+RENDER_FORMATS = {
+    "html": ("_repr_html_", "text/html"),
+    "md": ("_repr_markdown_", "text/markdown"),
+}
+"""The supported output formats with their repl method and content type."""
+
+
+class RenderService:
+    """
+    The RenderService loads, totals and renders budgets (or any other
+    ipybudget object implementing the IPython repl methods) for concurrent
+    requests. The loading and rendering is CPU-bound and therefore done in a
+    bounded executor. Concurrent requests for the same budget are merged into
+    one computation and the results are cached until the service is
+    invalidated.
+
+    The budgets are identified by a name which is resolved by the loader
+    callable given on initialization, normally a function importing the
+    notebook-defined budget.
+    """
+
+    __loader: Callable[[str], Any]
+    """Resolves a budget name to the budget object."""
+    __executor: ThreadPoolExecutor
+    """Executor running the CPU-bound loading and rendering."""
+    __cache: Dict[Tuple[str, str], Any]
+    """Results of the finished computations, keyed by kind and name."""
+    __pending: Dict[Tuple[str, str], "asyncio.Future[Any]"]
+    """Currently running computations, keyed by kind and name."""
+
+    def __init__(
+            self,
+            loader: Callable[[str], Any],
+            max_workers: int = 4,
+            executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        """
+        Initializes a new service with the given loader. The CPU-bound work
+        is done by a thread pool with max_workers threads unless another
+        thread pool is given. Process pools aren't supported as the loader
+        and the loaded budgets are shared with the executed calls and
+        normally can't be pickled.
+        """
+        self.__loader = loader
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix="ipybudget-render",
+            )
+        self.__executor = executor
+        self.__cache = {}
+        self.__pending = {}
+
+    async def load(self, name: str) -> Any:
+        """
+        Returns the budget with the given name. Raises BudgetNotFound when the
+        loader doesn't know the name.
+        """
+        return await self.__run(
+            ("load", name),
+            lambda: self.__in_executor(self.__load, name),
+        )
+
+    async def total(self, name: str) -> Money:
+        """
+        Returns the total of the group with the given name. For a Budget the
+        balance of it's summary is returned.
+        """
+        async def compute():
+            budget = await self.load(name)
+            if isinstance(budget, Budget):
+                summary = await self.__in_executor(budget.summary)
+                return summary.balance
+            return await self.__in_executor(budget.total)
+        return await self.__run(("total", name), compute)
+
+    async def render(self, name: str, format: str = "html") -> str:
+        """
+        Returns the rendered output of the budget with the given name. The
+        format is either `html` or `md`.
+        """
+        if format not in RENDER_FORMATS:
+            raise ValueError(
+                "unknown render format {}, use one of {}".format(
+                    format, ", ".join(RENDER_FORMATS))
+            )
+        method = RENDER_FORMATS[format][0]
+
+        async def compute():
+            budget = await self.load(name)
+            return await self.__in_executor(getattr(budget, method))
+        return await self.__run(("render-" + format, name), compute)
+
+    async def handle(self, path: str) -> Tuple[int, str, str]:
+        """
+        Handles a preview request for a path of the form `/<name>.<format>`
+        and returns the status code, content type and body. This can be
+        called from the request handler of any asyncio based web framework.
+        """
+        name, _, format = path.strip("/").rpartition(".")
+        if not name or format not in RENDER_FORMATS:
+            return 404, "text/plain", "not found"
+        try:
+            body = await self.render(name, format)
+        except BudgetNotFound:
+            return 404, "text/plain", "not found"
+        return 200, RENDER_FORMATS[format][1], body
+
+    def invalidate(self, name: Optional[str] = None):
+        """
+        Drops the cached results for the budget with the given name or for
+        all budgets if no name is given. Running computations are not
+        affected.
+        """
+        for key in list(self.__cache):
+            if name is None or key[1] == name:
+                del self.__cache[key]
+
+    def shutdown(self, wait: bool = True):
+        """Shuts down the executor of the service."""
+        self.__executor.shutdown(wait=wait)
+
+    async def __run(
+            self,
+            key: Tuple[str, str],
+            compute: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Returns the cached result for the key or runs the computation. When
+        the same computation is already running the caller waits for it's
+        result instead of starting another one. The computation isn't
+        cancelled with it's callers, it's result is cached nevertheless.
+        """
+        if key in self.__cache:
+            return self.__cache[key]
+        if key in self.__pending:
+            return await asyncio.shield(self.__pending[key])
+
+        future = asyncio.ensure_future(compute())
+        self.__pending[key] = future
+
+        def done(future: "asyncio.Future[Any]"):
+            # Runs when the computation finishes, even if all the callers
+            # were cancelled in the meantime.
+            if self.__pending.get(key) is future:
+                del self.__pending[key]
+            if not future.cancelled() and future.exception() is None:
+                self.__cache[key] = future.result()
+
+        future.add_done_callback(done)
+        return await asyncio.shield(future)
+
+    def __load(self, name: str) -> Any:
+        """
+        Calls the loader, lookup errors of the loader are reported as
+        BudgetNotFound.
+        """
+        try:
+            return self.__loader(name)
+        except LookupError:
+            raise BudgetNotFound(name)
+
+    def __in_executor(self, func: Callable[..., Any], *args: Any):
+        """Runs the function in the executor of the service."""
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self.__executor, func, *args)
+
+
+class BudgetNotFound(Exception):
+    """
+    Raised by the RenderService when the loader doesn't know the requested
+    budget (the loader raised a LookupError like KeyError).
+    """
+
+    def __init__(self, name: str):
+        msg = "there is no budget named {}".format(name)
+        super(Exception, self).__init__(msg)
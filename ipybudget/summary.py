@@ -0,0 +1,143 @@
+"""
+The summary module contains the rendering of the budget summary (balance and
+currency exposure).
+"""
+from decimal import Decimal
+from typing import Dict, List
+
+from money import Money
+from pytablewriter import MarkdownTableWriter
+from pytablewriter.style import Style as TableStyle
+from vdom import helpers as v
+
+
+class Summary:
+    """
+    The Summary contains the totals of the expenses and incomes, the balance,
+    the number of entries and the currency exposure of a budget. Instances
+    are created by the ipybudget.budget.Budget.summary method. The class
+    implements the IPython repl methods for outputting HTML and Markdown.
+    """
+
+    expenses: Money
+    """Total of all expenses."""
+    incomes: Money
+    """Total of all incomes."""
+    expense_count: int
+    """Number of expense entries."""
+    income_count: int
+    """Number of income entries."""
+    expense_exposure: Dict[str, Decimal]
+    """Sum of the expense amounts per currency, not converted."""
+    income_exposure: Dict[str, Decimal]
+    """Sum of the income amounts per currency, not converted."""
+
+    def __init__(
+            self,
+            expenses: Money,
+            incomes: Money,
+            expense_count: int,
+            income_count: int,
+            expense_exposure: Dict[str, Decimal],
+            income_exposure: Dict[str, Decimal],
+    ):
+        self.expenses = expenses
+        self.incomes = incomes
+        self.expense_count = expense_count
+        self.income_count = income_count
+        self.expense_exposure = expense_exposure
+        self.income_exposure = income_exposure
+
+    @property
+    def balance(self) -> Money:
+        """The incomes minus the expenses."""
+        return self.incomes - self.expenses
+
+    def currencies(self) -> List[str]:
+        """Returns all currencies used by the entries of the budget."""
+        return sorted(set(self.expense_exposure) | set(self.income_exposure))
+
+    def __exposure_rows(self) -> List[List[str]]:
+        """Returns the currency, expense and income amount per currency."""
+        return [
+            [
+                currency,
+                str(Money(self.expense_exposure.get(currency, 0), currency)),
+                str(Money(self.income_exposure.get(currency, 0), currency)),
+            ]
+            for currency in self.currencies()
+        ]
+
+    def _repr_html_(self):
+        """Output for the Jupyter notebook."""
+        balance = v.table(
+            v.tr(
+                v.th("Bezeichnung", style={"text-align": "left"}),
+                v.th("Anzahl", style={"text-align": "right"}),
+                v.th("Betrag", style={"text-align": "right"}),
+            ),
+            v.tr(
+                v.td("Total Expenses", style={"text-align": "left"}),
+                v.td(str(self.expense_count), style={"text-align": "right"}),
+                v.td(str(self.expenses), style={"text-align": "right"}),
+            ),
+            v.tr(
+                v.td("Total Incomes", style={"text-align": "left"}),
+                v.td(str(self.income_count), style={"text-align": "right"}),
+                v.td(str(self.incomes), style={"text-align": "right"}),
+            ),
+            v.tr(
+                v.td(v.u(v.b("Balance")), style={"text-align": "left"}),
+                v.td(),
+                v.td(
+                    v.u(v.b(str(self.balance))),
+                    style={"text-align": "right"},
+                ),
+            ),
+        )
+        exposure = v.table(
+            v.tr(
+                v.th("Währung", style={"text-align": "left"}),
+                v.th("Ausgaben", style={"text-align": "right"}),
+                v.th("Einnahmen", style={"text-align": "right"}),
+            ),
+            *[
+                v.tr(
+                    v.td(currency, style={"text-align": "left"}),
+                    v.td(expenses, style={"text-align": "right"}),
+                    v.td(incomes, style={"text-align": "right"}),
+                )
+                for currency, expenses, incomes in self.__exposure_rows()
+            ],
+        )
+        return balance.to_html() + exposure.to_html()
+
+    def _repr_markdown_(self):
+        """Output for Markdown."""
+        balance = MarkdownTableWriter(
+            headers=["Bezeichnung", "Anzahl", "Betrag"],
+            column_styles=[
+                TableStyle(align="left"),
+                TableStyle(align="right"),
+                TableStyle(align="right"),
+            ],
+            value_matrix=[
+                ["Total Expenses", str(self.expense_count),
+                 str(self.expenses)],
+                ["Total Incomes", str(self.income_count),
+                 str(self.incomes)],
+                ["**_Balance_**", "", f"**_{self.balance}_**"],
+            ],
+            margin=1,
+        )
+        exposure = MarkdownTableWriter(
+            headers=["Währung", "Ausgaben", "Einnahmen"],
+            column_styles=[
+                TableStyle(align="left"),
+                TableStyle(align="right"),
+                TableStyle(align="right"),
+            ],
+            value_matrix=self.__exposure_rows(),
+            margin=1,
+        )
+        return balance.dumps() + "\n" + exposure.dumps()
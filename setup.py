@@ -11,4 +11,7 @@ setuptools.setup(
         "pytablewriter==0.60.0",
         "vdom==0.6",
     ],
+    extras_require={
+        "xlsx": ["XlsxWriter"],
+    },
 )
@@ -0,0 +1,115 @@
+import csv
+import importlib.util
+import io
+import os
+import tempfile
+import unittest
+import zipfile
+
+from decimal import Decimal
+from xml.etree import ElementTree
+
+from ipybudget.budget import Budget
+from ipybudget.entry import Entry
+from ipybudget.export import EXPORT_HEADERS
+from ipybudget.group import Group
+from ipybudget.rates import Rates
+
+XLSX_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+
+def read_xlsx_cells(path):
+    """
+    Returns the cell values of the first sheet of a XLSX file written by the
+    export, keyed by the cell reference (e.g. `B7`).
+    """
+    with zipfile.ZipFile(path) as archive:
+        sheet = ElementTree.fromstring(
+            archive.read("xl/worksheets/sheet1.xml"))
+    rsl = {}
+    for cell in sheet.iter(f"{XLSX_NS}c"):
+        text = cell.find(f"{XLSX_NS}is/{XLSX_NS}t")
+        if text is None:
+            text = cell.find(f"{XLSX_NS}v")
+        rsl[cell.get("r")] = text.text
+    return rsl
+
+
+class TestExport(unittest.TestCase):
+    """Tests for the CSV and XLSX export of Groups and Budgets."""
+
+    def setUp(self):
+        rates = Rates()
+        rates.add_currency("USD", 2)
+        self.group = Group(
+            "Set Design",
+            [
+                Entry("Wood", 100, code="1.1"),
+                Group(
+                    "Paint",
+                    [
+                        Entry("Red", 200, currency="USD", comment="Import"),
+                    ],
+                    code="1.2",
+                ),
+            ],
+            code="1",
+        )
+
+    def test_group_csv(self):
+        """Tests the rows, subtotals and depth of a group CSV export."""
+        file = io.StringIO()
+        self.group.to_csv(file)
+        rows = list(csv.reader(io.StringIO(file.getvalue())))
+        self.assertEqual(rows, [
+            EXPORT_HEADERS,
+            ["1", "Set Design", "", "", "", "", "0"],
+            ["1.1", "Wood", "100", "EUR", "100", "", "1"],
+            ["1.2", "Paint", "", "", "", "", "1"],
+            ["", "Red", "200", "USD", "100.0", "Import", "2"],
+            ["", "Total Paint", "100.0", "EUR", "100.0", "", "1"],
+            ["", "Total Set Design", "200.0", "EUR", "200.0", "", "0"],
+        ])
+
+    def test_budget_csv(self):
+        """Tests the expenses and incomes sections of a budget export."""
+        budget = Budget(
+            expenses=[self.group],
+            incomes=[Entry("Grant", 500)],
+        )
+        file = io.StringIO()
+        budget.to_csv(file)
+        rows = list(csv.reader(io.StringIO(file.getvalue())))
+        self.assertEqual(rows[1][1], "Expenses")
+        self.assertEqual(rows[-4][1], "Total Expenses")
+        self.assertEqual(rows[-4][2], "200.0")
+        self.assertEqual(rows[-3][1], "Incomes")
+        self.assertEqual(rows[-2], ["", "Grant", "500", "EUR", "500", "", "1"])
+        self.assertEqual(rows[-1][1:3], ["Total Incomes", "500"])
+
+    def test_group_xlsx(self):
+        """Tests the XLSX export when XlsxWriter is available."""
+        if importlib.util.find_spec("xlsxwriter") is None:
+            self.skipTest("XlsxWriter isn't installed")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "budget.xlsx")
+            self.group.to_xlsx(path)
+            cells = read_xlsx_cells(path)
+        self.assertEqual(
+            [cells[f"{col}1"] for col in "ABCDEFG"], EXPORT_HEADERS)
+        self.assertEqual(cells["B7"], "Total Set Design")
+        self.assertEqual(Decimal(cells["C7"]), Decimal(200))
+        self.assertEqual(cells["D7"], "EUR")
+
+    def test_single_conversion(self):
+        """Each exported entry is converted only once."""
+        calls = []
+
+        class CountingEntry(Entry):
+            def amount_by_currency(self, currency):
+                calls.append(currency)
+                return super().amount_by_currency(currency)
+
+        group = Group("Tour", [CountingEntry("Hotel", 200, currency="USD")])
+        group.to_csv(io.StringIO())
+        self.assertEqual(calls, ["EUR"])
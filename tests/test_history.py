@@ -0,0 +1,102 @@
+import unittest
+
+from ipybudget.budget import Budget
+from ipybudget.entry import Entry, FrozenError
+from ipybudget.group import Group
+from ipybudget.history import History
+from ipybudget.rates import Rates
+
+from money import Money
+
+
+class TestHistory(unittest.TestCase):
+    """Tests for the persistent budget versions and their history."""
+
+    def setUp(self):
+        self.budget = Budget(
+            expenses=[
+                Group("Set Design", [
+                    Entry("Wood", 100, code="1.1"),
+                    Group("Paint", [Entry("Red", 200)]),
+                ]),
+                Group("Crew", [Entry("Fee", 300)]),
+            ],
+        )
+
+    def test_structural_sharing(self):
+        """Only the groups along the path are copied."""
+        first = self.budget.freeze()
+        second = first.replace([0, 1, 0], Entry("Blue", 50))
+
+        self.assertIs(first.expenses[1], second.expenses[1])
+        self.assertIs(first.expenses[0].items[0], second.expenses[0].items[0])
+        self.assertIsNot(first.expenses[0], second.expenses[0])
+        self.assertEqual(first.expenses[0].total(), Money(300, "EUR"))
+        self.assertEqual(second.expenses[0].total(), Money(150, "EUR"))
+        self.assertEqual(self.budget.expenses[0].total(), Money(300, "EUR"))
+
+    def test_frozen(self):
+        """Frozen items can't be altered."""
+        budget = self.budget.freeze()
+        with self.assertRaises(FrozenError):
+            budget.expenses[1].name = "Cast"
+        with self.assertRaises(FrozenError):
+            budget.expenses[1].items[0].amount = Money(1, "EUR")
+        entry = budget.expenses[1].items[0].evolve(amount=400)
+        self.assertEqual(entry.amount, Money(400, "EUR"))
+
+    def test_cached_total(self):
+        """Cached totals are invalidated when the rates change."""
+        rates = Rates()
+        rates.add_currency("USD", 2)
+        group = Group("Tour", [Entry("Hotel", 200, currency="USD")]).freeze()
+        self.assertEqual(group.total(), Money(100, "EUR"))
+        rates.add_currency("USD", 4)
+        self.assertEqual(group.total(), Money(50, "EUR"))
+
+    def test_undo_redo(self):
+        """Tests the versions of the history."""
+        history = History(self.budget)
+        history.replace([1, 0], Entry("Fee", 500))
+        history.replace([1, 0], Entry("Fee", 600))
+        self.assertEqual(len(history), 3)
+        self.assertEqual(
+            history.current.expenses[1].total(), Money(600, "EUR"))
+        history.undo()
+        self.assertEqual(
+            history.current.expenses[1].total(), Money(500, "EUR"))
+        history.redo()
+        self.assertEqual(
+            history.current.expenses[1].total(), Money(600, "EUR"))
+        history.undo()
+        history.undo()
+        with self.assertRaises(IndexError):
+            history.undo()
+
+    def test_evolve(self):
+        """Tests the validation of the altered attributes."""
+        entry = Entry("Fee", 300).freeze()
+        with self.assertRaises(TypeError):
+            entry.evolve(currency="USD")
+        with self.assertRaises(TypeError):
+            entry.evolve(_frozen=False)
+        with self.assertRaises(TypeError):
+            Group("Crew", [entry]).freeze().evolve(_frozen=False)
+        usd = entry.evolve(amount=Money(400, "USD"))
+        self.assertEqual(usd.currency, "USD")
+        self.assertEqual(usd.amount, Money(400, "USD"))
+        self.assertTrue(usd._frozen)
+
+    def test_no_observers_on_frozen_entries(self):
+        """Versions don't register themselves at the shared entries."""
+        budget = Budget(expenses=[
+            Entry("Fee", 300, tags=["EU"]),
+            Entry("Travel", 50, tags=["EU"]),
+        ])
+        history = History(budget)
+        for amount in range(10):
+            history.replace([1], Entry("Travel", amount, tags=["EU"]))
+            history.current.pivot()
+        shared = history.current.expenses[0]
+        self.assertIs(shared, history.versions[0].expenses[0])
+        self.assertNotIn("_observers", shared.__dict__)
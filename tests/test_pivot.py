@@ -0,0 +1,106 @@
+import unittest
+
+from ipybudget.budget import Budget
+from ipybudget.entry import Entry
+from ipybudget.group import Group
+from ipybudget.rates import Rates
+
+from money import Money
+
+
+class TestPivot(unittest.TestCase):
+    """Tests for the tag aggregates and pivot tables of the Budget."""
+
+    def setUp(self):
+        rates = Rates()
+        rates.add_currency("USD", 2)
+        self.wood = Entry("Wood", 100, tags=["City", "Material"])
+        self.paint = Entry("Paint", 200, currency="USD", tags=["EU"])
+        self.fee = Entry("Fee", 300, tags=["EU", "Personnel"])
+        self.sets = Group(
+            "Set Design",
+            [self.wood, Group("Paint", [self.paint])],
+            code="1",
+        )
+        self.crew = Group("Crew", [self.fee], code="2")
+        self.budget = Budget(
+            expenses=[self.sets, self.crew],
+            incomes=[Entry("Grant", 500, tags=["EU"])],
+        )
+
+    def test_tag_totals(self):
+        """Tests the per-tag and tag×group aggregates."""
+        self.assertEqual(
+            self.budget.tags(), ["City", "EU", "Material", "Personnel"])
+        self.assertEqual(self.budget.tag_total("EU"), Money(400, "EUR"))
+        self.assertEqual(
+            self.budget.tag_total("EU", incomes=True), Money(500, "EUR"))
+        self.assertEqual(
+            self.budget.tag_total("EU", self.sets), Money(100, "EUR"))
+        self.assertEqual(
+            self.budget.tag_total("Material", self.crew), Money(0, "EUR"))
+
+    def test_incremental_update(self):
+        """Tests that changed entries update the aggregates."""
+        self.paint.amount = Money(400, "USD")
+        self.assertEqual(self.budget.tag_total("EU"), Money(500, "EUR"))
+        self.assertEqual(
+            self.budget.tag_total("EU", self.sets), Money(200, "EUR"))
+
+        self.wood.tags = ("EU",)
+        self.assertEqual(self.budget.tag_total("EU"), Money(600, "EUR"))
+        self.assertEqual(self.budget.tag_total("City"), Money(0, "EUR"))
+        self.assertEqual(self.budget.tags(), ["EU", "Personnel"])
+
+    def test_pivot(self):
+        """Tests the rows and totals of a pivot table."""
+        pivot = self.budget.pivot(["EU", "Material"])
+        self.assertEqual(pivot.rows, [
+            ("1", "Set Design", [Money(100, "EUR"), Money(100, "EUR")]),
+            ("2", "Crew", [Money(300, "EUR"), Money(0, "EUR")]),
+        ])
+        self.assertEqual(pivot.totals, [Money(400, "EUR"), Money(100, "EUR")])
+        self.assertIn("Total Expenses", pivot._repr_markdown_())
+        self.assertIn("Total Expenses", pivot._repr_html_())
+
+    def test_pivot_top_level_entries(self):
+        """Top level entries are shown as their own pivot rows."""
+        budget = Budget(expenses=[
+            Group("Set Design", [Entry("Wood", 100, tags=["EU"])], code="1"),
+            Entry("Insurance", 50, code="2", tags=["EU"]),
+            Entry("Travel", 20, code="3"),
+        ])
+        pivot = budget.pivot(["EU"])
+        self.assertEqual(pivot.rows, [
+            ("1", "Set Design", [Money(100, "EUR")]),
+            ("2", "Insurance", [Money(50, "EUR")]),
+            ("3", "Travel", [Money(0, "EUR")]),
+        ])
+        self.assertEqual(pivot.totals, [Money(150, "EUR")])
+
+    def test_tags_validation(self):
+        """Tags are stored as tuples and a single string is rejected."""
+        with self.assertRaises(TypeError):
+            Entry("Wood", 100, tags="EU")
+        self.wood.tags = ["EU", "Material"]
+        self.assertEqual(self.wood.tags, ("EU", "Material"))
+        with self.assertRaises(TypeError):
+            self.wood.tags = "EU"
+
+    def test_rates_change(self):
+        """The aggregates are rebuilt after the exchange rates changed."""
+        self.assertEqual(self.budget.tag_total("EU"), Money(400, "EUR"))
+        Rates().add_currency("USD", 4)
+        self.assertEqual(self.budget.tag_total("EU"), Money(350, "EUR"))
+        self.assertEqual(
+            self.budget.pivot(["EU"]).totals, [Money(350, "EUR")])
+
+    def test_structural_changes(self):
+        """Added items are picked up without calling reindex."""
+        self.budget.pivot()
+        self.budget.expenses.append(Entry("Insurance", 50, tags=["EU"]))
+        self.sets.items[1].items.append(Entry("Blue", 20, tags=["EU"]))
+        pivot = self.budget.pivot(["EU"])
+        self.assertEqual(pivot.rows[0][2], [Money(120, "EUR")])
+        self.assertEqual(pivot.rows[2], ("", "Insurance", [Money(50, "EUR")]))
+        self.assertEqual(pivot.totals, [Money(470, "EUR")])
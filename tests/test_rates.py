@@ -1,9 +1,13 @@
+import datetime
+import io
 import unittest
 
 from ipybudget.entry import Entry
 from ipybudget.group import Group
 from ipybudget.rates import Rates
 
+from decimal import Decimal
+
 from money import Money
 
 
@@ -43,3 +47,57 @@ class TestRates(unittest.TestCase):
             ]
         )
         self.assertEqual(group.total(), Money(400, "EUR"))
+
+    def test_dated_entries(self):
+        """Dated entries are converted with the rate valid at their date."""
+        rates = Rates()
+        rates.add_rate("JPY", 100, datetime.date(2020, 1, 1))
+        rates.add_rate("JPY", 200, datetime.date(2021, 1, 1))
+        group = Group(
+            "Tour",
+            [
+                Entry("Hotel", 1000, currency="JPY",
+                      date=datetime.date(2020, 6, 1)),
+                Entry("Venue", 2000, currency="JPY",
+                      date=datetime.date(2021, 3, 1)),
+            ]
+        )
+        self.assertEqual(group.total(), Money(20, "EUR"))
+        self.assertEqual(
+            group.items[0].amount_by_currency("EUR"), Money(10, "EUR"))
+        self.assertEqual(rates.rate_at("JPY", datetime.date(2019, 1, 1)), None)
+        self.assertEqual(rates.rate("JPY"), 200)
+
+    def test_load_csv(self):
+        """Tests the bulk loading and batched lookup of historical rates."""
+        rates = Rates()
+        rates.load_csv(io.StringIO(
+            "date,currency,rate\n"
+            "2021-01-01,GBP,0.8\n"
+            "2020-01-01,GBP,0.5\n"
+        ))
+        days = [
+            datetime.date(2021, 5, 1),
+            datetime.date(2019, 5, 1),
+            datetime.date(2020, 5, 1),
+        ]
+        self.assertEqual(
+            rates.quotations_at("EUR", "GBP", days),
+            [Decimal("0.8"), None, Decimal("0.5")],
+        )
+
+    def test_long_history(self):
+        """Single and batched lookups in a long history."""
+        rates = Rates()
+        start = datetime.date(2000, 1, 1)
+        for day in range(5000):
+            rates.add_rate(
+                "SEK", 1 + day, start + datetime.timedelta(days=day))
+        entry = Entry("Ferry", 1000, currency="SEK",
+                      date=start + datetime.timedelta(days=999))
+        self.assertEqual(entry.amount_by_currency("EUR"), Money(1, "EUR"))
+        days = [start + datetime.timedelta(days=d) for d in (4999, 9, 99)]
+        self.assertEqual(
+            rates.quotations_at("EUR", "SEK", days),
+            [Decimal(5000), Decimal(10), Decimal(100)],
+        )
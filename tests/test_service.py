@@ -0,0 +1,152 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from ipybudget.budget import Budget
+from ipybudget.entry import Entry
+from ipybudget.group import Group
+from ipybudget.service import BudgetNotFound, RenderService
+
+from money import Money
+
+
+class StandInClient:
+    """Local stand-in for a HTTP client requesting previews."""
+
+    def __init__(self, service: RenderService):
+        self.service = service
+
+    async def get(self, path: str):
+        return await self.service.handle(path)
+
+
+class BrokenGroup(Group):
+    """Group whose rendering fails with a bug."""
+
+    def _repr_html_(self):
+        raise KeyError("bug")
+
+
+class SlowGroup(Group):
+    """Group whose rendering takes a while and is counted."""
+
+    renders = 0
+
+    def _repr_html_(self):
+        SlowGroup.renders += 1
+        time.sleep(0.05)
+        return super()._repr_html_()
+
+
+class TestRenderService(unittest.TestCase):
+    """Tests for the asyncio based RenderService."""
+
+    def setUp(self):
+        self.loads = 0
+        self.lock = threading.Lock()
+
+        def loader(name):
+            if name == "broken":
+                return BrokenGroup("Broken", [])
+            if name == "slow":
+                return SlowGroup("Slow", [Entry("Wood", 100)])
+            if name == "production":
+                return Budget(
+                    expenses=[Group("Crew", [Entry("Fee", 300)])],
+                    incomes=[Entry("Grant", 500)],
+                )
+            if name != "sets":
+                raise KeyError(name)
+            with self.lock:
+                self.loads += 1
+            return Group("Set Design", [Entry("Wood", 100, code="1.1")])
+
+        self.service = RenderService(loader, max_workers=2)
+
+    def tearDown(self):
+        self.service.shutdown()
+
+    def test_concurrent_requests(self):
+        """Concurrent requests are merged and served from one load."""
+        client = StandInClient(self.service)
+
+        async def run():
+            return await asyncio.gather(
+                *[client.get("/sets.html") for _ in range(30)],
+                *[client.get("/sets.md") for _ in range(10)],
+            )
+
+        rsl = asyncio.run(run())
+        self.assertEqual(self.loads, 1)
+        self.assertEqual({r[:2] for r in rsl[:30]}, {(200, "text/html")})
+        self.assertEqual({r[:2] for r in rsl[30:]}, {(200, "text/markdown")})
+        self.assertIn("Wood", rsl[0][2])
+
+    def test_total_and_cache(self):
+        """Tests the total and the invalidation of the cache."""
+        async def run():
+            first = await self.service.total("sets")
+            await self.service.total("sets")
+            self.service.invalidate("sets")
+            second = await self.service.total("sets")
+            return first, second
+
+        first, second = asyncio.run(run())
+        self.assertEqual(first, Money(100, "EUR"))
+        self.assertEqual(second, Money(100, "EUR"))
+        self.assertEqual(self.loads, 2)
+
+    def test_not_found(self):
+        """Unknown budgets and formats result in a 404."""
+        client = StandInClient(self.service)
+
+        async def run():
+            return await asyncio.gather(
+                client.get("/unknown.html"),
+                client.get("/sets.pdf"),
+            )
+
+        for status, _, _ in asyncio.run(run()):
+            self.assertEqual(status, 404)
+
+    def test_budget(self):
+        """A loaded Budget is rendered and totaled by it's summary."""
+        client = StandInClient(self.service)
+
+        async def run():
+            return await asyncio.gather(
+                client.get("/production.html"),
+                client.get("/production.md"),
+                self.service.total("production"),
+            )
+
+        html, md, total = asyncio.run(run())
+        self.assertEqual(html[:2], (200, "text/html"))
+        self.assertIn("Balance", html[2])
+        self.assertEqual(md[:2], (200, "text/markdown"))
+        self.assertEqual(total, Money(200, "EUR"))
+
+    def test_render_errors(self):
+        """Errors during rendering aren't reported as not found."""
+        client = StandInClient(self.service)
+        with self.assertRaises(KeyError):
+            asyncio.run(client.get("/broken.html"))
+        with self.assertRaises(BudgetNotFound):
+            asyncio.run(self.service.load("unknown"))
+
+    def test_cancelled_caller(self):
+        """A cancelled caller doesn't break the merging of requests."""
+        SlowGroup.renders = 0
+
+        async def run():
+            first = asyncio.ensure_future(self.service.render("slow"))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            second = await self.service.render("slow")
+            third = await self.service.render("slow")
+            return second, third
+
+        second, third = asyncio.run(run())
+        self.assertEqual(second, third)
+        self.assertEqual(SlowGroup.renders, 1)
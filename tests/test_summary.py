@@ -0,0 +1,102 @@
+import unittest
+
+from ipybudget.budget import Budget
+from ipybudget.entry import Entry
+from ipybudget.group import Group
+from ipybudget.rates import Rates
+
+from decimal import Decimal
+
+from money import Money
+
+
+class TestSummary(unittest.TestCase):
+    """Tests for the Budget summary."""
+
+    def setUp(self):
+        rates = Rates()
+        rates.add_currency("USD", 2)
+        self.budget = Budget(
+            expenses=[
+                Group("Set Design", [
+                    Entry("Wood", 100),
+                    Group("Paint", [Entry("Red", 200, currency="USD")]),
+                ]),
+                Entry("Insurance", 50),
+            ],
+            incomes=[
+                Entry("Grant", 500),
+                Entry("Sponsor", 100, currency="USD"),
+            ],
+        )
+
+    def test_summary(self):
+        """Tests the totals, balance, counts and exposure."""
+        summary = self.budget.summary()
+        self.assertEqual(summary.expenses, Money(250, "EUR"))
+        self.assertEqual(summary.incomes, Money(550, "EUR"))
+        self.assertEqual(summary.balance, Money(300, "EUR"))
+        self.assertEqual(summary.expense_count, 3)
+        self.assertEqual(summary.income_count, 2)
+        self.assertEqual(summary.expense_exposure, {
+            "EUR": Decimal(150),
+            "USD": Decimal(200),
+        })
+        self.assertEqual(summary.currencies(), ["EUR", "USD"])
+        self.assertIn("Balance", summary._repr_markdown_())
+        self.assertIn("Balance", summary._repr_html_())
+
+    def test_reuse_of_frozen_totals(self):
+        """The totals of persistent versions are reused after the summary."""
+        budget = self.budget.freeze()
+        summary = budget.summary()
+        self.assertIs(budget.summary(), summary)
+
+        group = budget.expenses[0]
+        self.assertEqual(
+            group._aggregate(), group.__dict__["_aggregated"][3])
+        self.assertEqual(group.total(), Money(200, "EUR"))
+
+    def test_reuse_of_mutable_totals(self):
+        """Renderings after the summary reuse the totals of mutable groups."""
+        self.budget.summary()
+        group = self.budget.expenses[0]
+        calls = []
+        aggregate = Group._Group__aggregate
+
+        def counting(self):
+            calls.append(self)
+            return aggregate(self)
+
+        Group._Group__aggregate = counting
+        try:
+            group._repr_html_()
+            group._repr_markdown_()
+            # Only the single entry groups created for the rendering are
+            # calculated.
+            self.assertNotIn(group, calls)
+            self.assertNotIn(group.items[1], calls)
+
+            # Altered entries, replaced attributes and item lists edited in
+            # place invalidate the cache.
+            group.items[1].items[0].amount = Money(400, "USD")
+            self.assertEqual(group.total(), Money(300, "EUR"))
+            group.items[1].items.append(Entry("Blue", 50))
+            self.assertEqual(group.total(), Money(350, "EUR"))
+            group.items.append(Entry("Nails", 10))
+            self.assertEqual(
+                self.budget.summary().expenses, Money(410, "EUR"))
+        finally:
+            Group._Group__aggregate = aggregate
+
+    def test_parent_after_sub_group_render(self):
+        """A sub-group recalculated on it's own invalidates the parent."""
+        paint = Group("Paint", [Entry("Red", 10)])
+        sets = Group("Set Design", [Entry("Wood", 100), paint])
+        budget = Budget(expenses=[sets])
+        budget.summary()
+        paint.items.append(Entry("Blue", 5))
+        self.assertIn("EUR 15.00", paint._repr_html_())
+        self.assertEqual(sets.total(), Money(115, "EUR"))
+        self.assertIn("EUR 115.00", sets._repr_html_())
+        self.assertEqual(budget.summary().expenses, Money(115, "EUR"))